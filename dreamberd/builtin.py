@@ -30,8 +30,8 @@ def is_int(x: Union[float, int]) -> bool:
 
 def db_not(x: DreamberdBoolean) -> DreamberdBoolean:
     if x.value is None:
-        return DreamberdBoolean(None)
-    return DreamberdBoolean(not x.value)
+        return DB_MAYBE
+    return db_boolean(not x.value)
 
 def db_list_push(self: DreamberdList, val: DreamberdValue) -> None:
     self.indexer[max(self.indexer.keys())+1] = len(self.values)-1
@@ -84,13 +84,26 @@ def db_str_pop(self: DreamberdString, index: Union[DreamberdNumber, DreamberdSpe
 #     @abstractmethod 
 #     def to_str(self) -> Value: pass
 
+def set_pickled_state(self, state: Union[dict, tuple, None]) -> None:
+    """ 
+    Values are pickled for variables with an Infinity lifetime. Ones pickled before these classes had slots
+    have a dict as their state, and the default for slots is (None, dict), so this accepts both.
+    """
+    if isinstance(state, tuple):
+        state = state[1]
+    for name, val in (state or {}).items():
+        object.__setattr__(self, name, val)
+
+# everything here uses slots, so the values are smaller and don't each carry a __dict__ 
 class DreamberdValue():  # base class for shit  
-    pass
+    __slots__ = ()
+    __setstate__ = set_pickled_state
 
 class DreamberdMutable(DreamberdValue):  # mutable values
-    pass
+    __slots__ = ()
 
 class DreamberdIndexable(DreamberdValue, metaclass=ABCMeta):
+    __slots__ = ()
     
     @abstractmethod 
     def access_index(self, index: DreamberdValue) -> DreamberdValue: pass
@@ -99,21 +112,22 @@ class DreamberdIndexable(DreamberdValue, metaclass=ABCMeta):
     def assign_index(self, index: DreamberdValue, val: DreamberdValue) -> None: pass
 
 class DreamberdNamespaceable(DreamberdValue, metaclass=ABCMeta):
+    __slots__ = ()
     namespace: dict[str, Union[Name, Variable]]
 
-@dataclass 
+@dataclass(slots=True)
 class DreamberdFunction(DreamberdValue):  
     args: list[str]
     code: list[tuple[CodeStatement, ...]]
     is_async: bool
 
-@dataclass
+@dataclass(slots=True)
 class BuiltinFunction(DreamberdValue):
     arg_count: int
     function: Callable
     modifies_caller: bool = False
 
-@dataclass 
+@dataclass(slots=True)
 class DreamberdList(DreamberdIndexable, DreamberdNamespaceable, DreamberdMutable, DreamberdValue):
     values: list[DreamberdValue]
     indexer: dict[float, int] = field(init = False) # used for converting the user decimal indecies to the real indecies  
@@ -172,7 +186,7 @@ class DreamberdList(DreamberdIndexable, DreamberdNamespaceable, DreamberdMutable
                 if user_index > index.value:
                     self.indexer[user_index] += 1
 
-@dataclass(unsafe_hash=True)
+@dataclass(unsafe_hash=True, slots=True)
 class DreamberdNumber(DreamberdIndexable, DreamberdMutable, DreamberdValue):
     value: Union[int, float]
 
@@ -207,7 +221,7 @@ class DreamberdNumber(DreamberdIndexable, DreamberdMutable, DreamberdValue):
             index_num = round(max((index.value + 2) // 1, 0))
             self.value = sign * int(self_val_str[:index_num] + str(round(val.value)) + self_val_str[index_num:])
 
-@dataclass(unsafe_hash=True)
+@dataclass(unsafe_hash=True, slots=True)
 class DreamberdString(DreamberdIndexable, DreamberdNamespaceable, DreamberdMutable, DreamberdValue):
     value: str = field(hash=True)
     indexer: dict[float,tuple] = field(init = False,hash=False) # used for converting the user decimal indecies to the real indecies  
@@ -287,23 +301,33 @@ class DreamberdString(DreamberdIndexable, DreamberdNamespaceable, DreamberdMutab
                     self.indexer[user_index] = indexer_data
             self.create_namespace()
 
-@dataclass 
+@dataclass(slots=True)
 class DreamberdBoolean(DreamberdValue):
     value: Optional[bool]  # none represents maybe?
 
-@dataclass 
+@dataclass(slots=True)
 class DreamberdUndefined(DreamberdValue):
     pass
-@dataclass 
+
+# booleans are never changed in place, so the interpreter shares one of each for its own checks. a boolean the program 
+# gets back is still made new every time, because separately made values are never really really equal (====)
+DB_TRUE = DreamberdBoolean(True)
+DB_FALSE = DreamberdBoolean(False)
+DB_MAYBE = DreamberdBoolean(None)
+
+def db_boolean(value: Optional[bool]) -> DreamberdBoolean:
+    return DB_MAYBE if value is None else DB_TRUE if value else DB_FALSE
+
+@dataclass(slots=True)
 class DreamberdSpecialBlankValue(DreamberdValue):
     pass
 
-@dataclass 
+@dataclass(slots=True)
 class DreamberdObject(DreamberdNamespaceable, DreamberdValue):
     class_name: str
     namespace: dict[str, Union[Name, Variable]] = field(default_factory=dict)
 
-@dataclass 
+@dataclass(slots=True)
 class DreamberdMap(DreamberdIndexable, DreamberdValue):
     self_dict: dict[Union[int, float, str], DreamberdValue]
 
@@ -317,32 +341,35 @@ class DreamberdMap(DreamberdIndexable, DreamberdValue):
             raise NonFormattedError("Keys of a map must be an index or a number.")
         self.self_dict[index.value] = val
 
-@dataclass 
+@dataclass(slots=True)
 class DreamberdKeyword(DreamberdValue):
     value: str
 
-@dataclass 
+@dataclass(slots=True)
 class DreamberdPromise(DreamberdValue):
     value: Optional[DreamberdValue]
 
-@dataclass
+@dataclass(slots=True)
 class Name:
     name: str
     value: DreamberdValue
+    __setstate__ = set_pickled_state
 
-@dataclass 
+@dataclass(slots=True)
 class VariableLifetime:
     value: DreamberdValue
     lines_left: int 
     confidence: int
     can_be_reset: bool
     can_edit_value: bool
+    __setstate__ = set_pickled_state
 
-@dataclass
+@dataclass(slots=True)
 class Variable:
     name: str 
     lifetimes: list[VariableLifetime]
     prev_values: list[DreamberdValue]
+    __setstate__ = set_pickled_state
 
     @property 
     def can_be_reset(self) -> bool:
@@ -422,18 +449,22 @@ def db_to_boolean(val: DreamberdValue) -> DreamberdBoolean:
         case DreamberdMap():
             return_bool = bool(val.self_dict)
         case DreamberdBoolean():
-            return_bool = val.value
+            return val  # booleans are never changed in place, so no copy is needed
         case DreamberdUndefined():
             return_bool = False
         case DreamberdFunction() | DreamberdObject() | DreamberdKeyword():
             return_bool = None  # maybe for these cause im mischevious
-    return DreamberdBoolean(return_bool)
+    return db_boolean(return_bool)
 
+def db_make_boolean(val: DreamberdValue) -> DreamberdBoolean:
+    return DreamberdBoolean(db_to_boolean(val).value)
+
+# the conversions hand back the value itself if it already has the right type, the String and Number keywords
+# below still make a new value since the result could be changed in place by the user 
 def db_to_string(val: DreamberdValue) -> DreamberdString:
-    return_string = str(val)
     match val:
         case DreamberdString():
-            return_string = val.value
+            return val
         case DreamberdList():
             return_string = f"[{', '.join([db_to_string(v).value for v in val.values])}]"
         case DreamberdBoolean():
@@ -451,8 +482,13 @@ def db_to_string(val: DreamberdValue) -> DreamberdString:
             return_string = val.value
         case DreamberdMap():
             return_string = f'{{{", ".join([f"{k}: {db_to_string(v).value}" for k, v in val.self_dict.items()])}}}'
+        case _:
+            return_string = str(val)
     return DreamberdString(return_string)
 
+def db_make_string(val: DreamberdValue) -> DreamberdString:
+    return DreamberdString(db_to_string(val).value)
+
 def db_print(*vals: DreamberdValue) -> None:
     print(*[db_to_string(v).value for v in vals])
 
@@ -460,7 +496,7 @@ def db_to_number(val: DreamberdValue) -> DreamberdNumber:
     return_number = 0
     match val:
         case DreamberdNumber():
-            return_number = val.value
+            return val
         case DreamberdString():
             return_number = float(val.value)
         case DreamberdUndefined():
@@ -479,6 +515,9 @@ def db_to_number(val: DreamberdValue) -> DreamberdNumber:
             raise NonFormattedError(f"Cannot turn type {type(val).__name__} into a number.")
     return DreamberdNumber(return_number)
 
+def db_make_number(val: DreamberdValue) -> DreamberdNumber:
+    return DreamberdNumber(db_to_number(val).value)
+
 def db_signal(starting_value: DreamberdValue) -> DreamberdValue:
     obj = Name('', starting_value)
     def signal_func(setter_val: DreamberdValue) -> Optional[DreamberdValue]:
@@ -519,17 +558,17 @@ BUILTIN_FUNCTION_KEYWORDS = {
     "new": Name("new", BuiltinFunction(1, db_identity)),
     "current": Name("current", BuiltinFunction(1, db_identity)),
     "Map": Name("Map", BuiltinFunction(0, db_map)),
-    "Boolean": Name("Boolean", BuiltinFunction(1, db_to_boolean)),
-    "String": Name("String", BuiltinFunction(1, db_to_string)),
+    "Boolean": Name("Boolean", BuiltinFunction(1, db_make_boolean)),
+    "String": Name("String", BuiltinFunction(1, db_make_string)),
     "print": Name("print", BuiltinFunction(-1, db_print)),
     "exit": Name("exit", BuiltinFunction(0, db_exit)),
-    "Number": Name("Number", BuiltinFunction(1, db_to_number)),
+    "Number": Name("Number", BuiltinFunction(1, db_make_number)),
     "use": Name("use", BuiltinFunction(1, db_signal))
 }
 BUILTIN_VALUE_KEYWORDS = {
-    "true": Name("true", DreamberdBoolean(True)),
-    "maybe": Name("maybe", DreamberdBoolean(None)),
-    "false": Name("false", DreamberdBoolean(False)),
+    "true": Name("true", DB_TRUE),
+    "maybe": Name("maybe", DB_MAYBE),
+    "false": Name("false", DB_FALSE),
     "undefined": Name("undefined", DreamberdUndefined()),
     "": Name("", DreamberdSpecialBlankValue())
 }
@@ -7,7 +7,6 @@
 
 from __future__ import annotations
 import os
-import re
 import sys
 import json
 import locale
@@ -17,9 +16,9 @@ import requests
 from time import sleep
 from pathlib import Path
 from copy import deepcopy
-from threading import Thread
+from threading import Condition, Thread
 from difflib import SequenceMatcher
-from typing import Literal, Optional, TypeAlias, Union 
+from typing import Any, Callable, Iterable, Literal, Optional, TypeAlias, Union 
 
 KEY_MOUSE_IMPORTED = True
 try: 
@@ -34,10 +33,11 @@ except ImportError:
     GITHUB_IMPORTED = False
 
 from dreamberd.base import NonFormattedError, OperatorType, Token, TokenType, debug_print, debug_print_no_token, raise_error_at_line, raise_error_at_token
-from dreamberd.builtin import FLOAT_TO_INT_PREC, BuiltinFunction, DreamberdBoolean, DreamberdFunction, DreamberdIndexable, DreamberdKeyword, DreamberdList, DreamberdMap, DreamberdMutable, DreamberdNamespaceable, DreamberdNumber, DreamberdObject, DreamberdPromise, DreamberdSpecialBlankValue, DreamberdString, DreamberdUndefined, Name, Variable, DreamberdValue, VariableLifetime, db_not, db_to_boolean, db_to_number, db_to_string, is_int
+from dreamberd.builtin import DB_FALSE, DB_MAYBE, DB_TRUE, FLOAT_TO_INT_PREC, FUNCTION_KEYWORDS, BuiltinFunction, DreamberdBoolean, DreamberdFunction, DreamberdIndexable, DreamberdKeyword, DreamberdList, DreamberdMap, DreamberdMutable, DreamberdNamespaceable, DreamberdNumber, DreamberdObject, DreamberdPromise, DreamberdSpecialBlankValue, DreamberdString, DreamberdUndefined, Name, Variable, DreamberdValue, VariableLifetime, db_boolean, db_not, db_to_boolean, db_to_number, db_to_string, is_int
 from dreamberd.serialize import serialize_obj, deserialize_obj
 from dreamberd.processor.lexer import tokenize as db_tokenize
 from dreamberd.processor.expression_tree import ExpressionTreeNode, FunctionNode, ListNode, SingleOperatorNode, ValueNode, IndexNode, ExpressionNode, build_expression_tree, get_expr_first_token
+from dreamberd.processor.bytecode import BINOP, BUILD_LIST, CALL, FOLD, INDEX, JUMP_IF_FALSE, JUMP_IF_TRUE, LOAD_FUNC, LOAD_NAME, LOAD_NUMBER, LOAD_STRING, UNARY, get_compiled_expression
 from dreamberd.processor.syntax_tree import AfterStatement, ClassDeclaration, CodeStatement, CodeStatementKeywordable, Conditional, DeleteStatement, ExportStatement, ExpressionStatement, FunctionDefinition, ImportStatement, ReturnStatement, ReverseStatement, VariableAssignment, VariableDeclaration, WhenStatement
 
 # several "ratios" used in the approx equal function
@@ -54,6 +54,19 @@ INF_VAR_PATH = ".inf_vars"
 INF_VAR_VALUES_PATH = ".inf_vars_values"
 DB_VAR_TO_VALUE_SEP = ";;;"  # i'm feeling fancy
 
+# keywords that have to be used for each statement to be detected. these stay sets instead of a predicate per type, 
+# since strings cache their hash and a set lookup is cheaper than calling a lambda
+STATEMENT_KEYWORDS: dict[type[CodeStatementKeywordable], frozenset[str]] = {
+    Conditional: frozenset({'if'}),
+    WhenStatement: frozenset({'when'}),
+    AfterStatement: frozenset({'after'}),
+    ClassDeclaration: frozenset({'class', 'className'}),
+    DeleteStatement: frozenset({'delete'}),
+    ReverseStatement: frozenset({'reverse'}),
+    ImportStatement: frozenset({'import'})
+}
+FUNCTION_KEYWORD_VALUES = frozenset(FUNCTION_KEYWORDS) | {''}  # everything matched by ^f?u?n?c?t?i?o?n?$
+
 # :D 
 Namespace: TypeAlias = dict[str, Union[Variable, Name]]
 CodeStatementWithExpression: TypeAlias = Union[ReturnStatement, Conditional, ExpressionStatement, WhenStatement,
@@ -62,6 +75,29 @@ AsyncStatements: TypeAlias = list[tuple[list[tuple[CodeStatement, ...]], list[Na
 NameWatchers: TypeAlias = dict[tuple[str, int], tuple[CodeStatementWithExpression, set[tuple[str, int]], list[Namespace], Optional[DreamberdPromise]]]
 WhenStatementWatchers: TypeAlias = list[dict[Union[str, int], list[tuple[ExpressionTreeNode, list[tuple[CodeStatement, ...]]]]]]  # bro there are six square brackets...
 
+# waiting for the next value of a variable sleeps on this instead of spinning, since the new value can only come from 
+# another thread (like an `after` listener). it is notified whenever a variable gets a value or is removed from its 
+# namespace, and the timeout is only there so dead listeners are still noticed
+value_changed = Condition()
+value_waiters = 0  # how many threads are waiting, so assignments only take the lock when someone is listening
+DEAD_LISTENER_CHECK_INTERVAL = 0.1
+
+def notify_value_changed() -> None:
+    if value_waiters:  # read without the lock, a waiter that registers after this checks the new value before sleeping
+        with value_changed:
+            value_changed.notify_all()
+
+def wait_for_value_change(is_unchanged: Callable[[], bool]) -> None:
+    global value_waiters
+    with value_changed:
+        value_waiters += 1
+        try:
+            while is_unchanged():
+                exit_on_dead_listener()
+                value_changed.wait(DEAD_LISTENER_CHECK_INTERVAL)
+        finally:
+            value_waiters -= 1
+
 def get_built_expression(expr: Union[list[Token], ExpressionTreeNode]) -> ExpressionTreeNode:
     return expr if isinstance(expr, ExpressionTreeNode) else build_expression_tree(filename, expr, code)
 
@@ -71,27 +107,22 @@ def get_modified_next_name(name: str, ns: int) -> str:
 def get_modified_prev_name(name: str) -> str:
     return f"{name.replace('.', '__')}__prev"
 
-# i believe this function is exclusively called from the evaluate_expression function
-def evaluate_normal_function(expr: FunctionNode, func: Union[DreamberdFunction, BuiltinFunction], namespaces: list[Namespace], args: list[DreamberdValue], when_statement_watchers: WhenStatementWatchers) -> DreamberdValue:
+def evaluate_builtin_function(expr: FunctionNode, func: BuiltinFunction, args: list[DreamberdValue]) -> DreamberdValue:
+    """ User functions that run right away are run in the CALL instruction of evaluate_expression instead. """
+    if func.arg_count > len(args):
+        raise_error_at_token(filename, code, f"Expected more arguments for function call with {func.arg_count} argument{'s' if func.arg_count != 1 else ''}.", expr.name)
+    max_arg_count = func.arg_count if func.arg_count >= 0 else len(args)
+    return func.function(*args[:max_arg_count]) or DreamberdUndefined()
 
-    # check to evaluate builtin
-    if isinstance(func, BuiltinFunction):
-        if func.arg_count > len(args):
-            raise_error_at_token(filename, code, f"Expected more arguments for function call with {func.arg_count} argument{'s' if func.arg_count != 1 else ''}.", expr.name)
-        max_arg_count = func.arg_count if func.arg_count >= 0 else len(args)
-        return func.function(*args[:max_arg_count]) or DreamberdUndefined()
-    
-    # check length is proper, adjust namespace, and run this code
+def get_function_namespace(expr: FunctionNode, func: DreamberdFunction, args: list[DreamberdValue]) -> Namespace:
+    """ Checks that there are enough arguments and puts them into the namespace the function body runs in. """
     if len(func.args) > len(args):
         raise_error_at_token(filename, code, f"Expected more arguments for function call with {len(func.args)} argument{'s' if len(func.args) != 1 else ''}.", expr.name)
-    new_namespace: Namespace = {name: Name(name, arg) for name, arg in zip(func.args, args)}
-    return interpret_code_statements(func.code, namespaces + [new_namespace], [], when_statement_watchers + [{}]) or DreamberdUndefined()
+    return {name: Name(name, arg) for name, arg in zip(func.args, args)}
 
 def register_async_function(expr: FunctionNode, func: DreamberdFunction, namespaces: list[Namespace], args: list[DreamberdValue], async_statements: AsyncStatements) -> None:
     """ Adds a job to the async statements queue, which is accessed in the interpret_code_statements function. """
-    if len(func.args) > len(args):
-        raise_error_at_token(filename, code, f"Expected more arguments for function call with {len(func.args)} argument{'s' if len(func.args) != 1 else ''}.", expr.name)
-    function_namespaces = namespaces + [{name: Name(name, arg) for name, arg in zip(func.args, args)}]
+    function_namespaces = namespaces + [get_function_namespace(expr, func, args)]
     async_statements.append((func.code, function_namespaces, 0, 1))
 
 def get_code_from_when_statement_watchers(name_or_id: Union[str, int], when_statement_watchers: WhenStatementWatchers) -> list[tuple[ExpressionTreeNode, list[tuple[CodeStatement, ...]]]]:
@@ -194,6 +225,7 @@ def declare_new_variable(statement: VariableDeclaration, value: DreamberdValue,
     else:  # for loop finished unbroken, no matches found
         target_var = Variable(name, [target_lifetime], [])
         namespaces[-1][name] = target_var
+    notify_value_changed()
 
     match debug:
         case 0: pass 
@@ -326,6 +358,7 @@ def assign_variable(statement: VariableAssignment, indexes: list[DreamberdValue]
         if not var.can_be_reset:
             raise_error_at_token(filename, code, "Attempted to set a variable that cannot be set.", name_token)
         var.add_lifetime(new_value, confidence, 100000000000, var.can_be_reset, var.can_edit_value)
+        notify_value_changed()
 
     # check if there is anything watching this value
     watchers_key = (name.split('.')[-1], id(ns))  # this shit should be a seperate function
@@ -359,6 +392,19 @@ def get_value_from_promise(val: DreamberdPromise) -> DreamberdValue:
         return DreamberdUndefined()
     return val.value
 
+def copy_value(val: DreamberdValue) -> DreamberdValue:
+    """ A cheaper deepcopy: only values that can be changed in place get copied, and numbers are remade directly. """
+    match val:
+        case DreamberdKeyword() | DreamberdFunction() | BuiltinFunction() | DreamberdSpecialBlankValue():
+            return val
+        case DreamberdNumber():
+            return DreamberdNumber(val.value)
+        case DreamberdBoolean():
+            return DreamberdBoolean(val.value)
+        case DreamberdUndefined():
+            return DreamberdUndefined()
+    return deepcopy(val)  # strings keep their indexer, and lists, maps and objects can hold anything
+
 def get_name_from_namespaces(name: str, namespaces: list[Namespace]) -> Optional[Union[Variable, Name]]:
     """ This is called when we are sure that the value is a name. """
     if len(name_split := name.split('.')) == 1:
@@ -401,33 +447,55 @@ def get_name_and_namespace_from_namespaces(name: str, namespaces: list[Namespace
 def evaluate_escape_sequences(val: DreamberdString) -> DreamberdString:  # this needs only be called once per completed string
     return DreamberdString(eval(f'"{val.value.replace(f"{chr(34)}", f"{chr(92)}{chr(34)}")}"'))  # cursed string parsing
 
+currency_symbol: Optional[str] = None
+
+def get_currency_symbol() -> str:
+    """ The locale doesn't change while the program runs, so this only has to be looked up the first time. """
+    global currency_symbol
+    if currency_symbol is None:
+        try:
+            locale.setlocale(locale.LC_ALL, locale.getlocale()[0])
+            currency_symbol = locale.localeconv()['currency_symbol']  # type: ignore 
+        except locale.Error:
+            currency_symbol = '$'
+    return currency_symbol  # type: ignore
+
+# string -> the expressions interpolated into it, with where each one goes. the text of a string never changes, so 
+# each one is only parsed once and the built expressions keep their compiled bytecode between evaluations
+interpolated_expressions: dict[str, list[tuple[ExpressionTreeNode, tuple[int, int]]]] = {}
+
+def get_interpolated_expressions(val_string: str, symbol: str) -> list[tuple[ExpressionTreeNode, tuple[int, int]]]:
+    if (expressions := interpolated_expressions.get(val_string)) is not None:
+        return expressions
+    expressions = []
+    indeces = [val_string[i:i+len(symbol)] == symbol for i in range(len(val_string) - len(symbol))]
+    for group_start_index in [i for i in range(len(indeces)) if indeces[i]]:
+        if val_string[group_start_index + len(symbol)] == '{':
+            end_index = group_start_index + len(symbol)
+            bracket_layers = 1
+            while bracket_layers:  # if this errs, it will be caught and detected as invalid formatting
+                end_index += 1
+                if val_string[end_index] == '{':
+                    bracket_layers += 1 
+                elif val_string[end_index] == '}':
+                    bracket_layers -= 1
+            
+            # end_index is now the index containing the bracket.
+            internal_tokens = db_tokenize(f"{filename}__interpolated_string", val_string[group_start_index + len(symbol) + 1 : end_index ])
+            expressions.append((build_expression_tree(filename, internal_tokens, code), (group_start_index, end_index + 1)))
+    interpolated_expressions[val_string] = expressions
+    return expressions
+
 def interpret_formatted_string(val: Token, namespaces: list[Namespace], async_statements: AsyncStatements, when_statement_watchers: WhenStatementWatchers) -> DreamberdString:
     val_string = val.value
-    try:
-        locale.setlocale(locale.LC_ALL, locale.getlocale()[0])
-        symbol: str = locale.localeconv()['currency_symbol']  # type: ignore 
-    except locale.Error:
-        symbol = '$'
-    if not any(indeces := [val_string[i:i+len(symbol)] == symbol for i in range(len(val_string) - len(symbol))]):
+    symbol = get_currency_symbol()
+    if symbol not in val_string:
         return DreamberdString(val_string)
     try:
         evaluated_values: list[tuple[str, tuple[int, int]]] = []  # [(str, (start, end))...]
-        for group_start_index in [i for i in range(len(indeces)) if indeces[i]]:
-            if val_string[group_start_index + len(symbol)] == '{':
-                end_index = group_start_index + len(symbol)
-                bracket_layers = 1
-                while bracket_layers:  # if this errs, it will be caught and detected as invalid formatting
-                    end_index += 1
-                    if val_string[end_index] == '{':
-                        bracket_layers += 1 
-                    elif val_string[end_index] == '}':
-                        bracket_layers -= 1
-                
-                # end_index is now the index containing the bracket.
-                internal_tokens = db_tokenize(f"{filename}__interpolated_string", val_string[group_start_index + len(symbol) + 1 : end_index ])
-                internal_expr = build_expression_tree(filename, internal_tokens, code)
-                internal_value = evaluate_expression(internal_expr, namespaces, async_statements, when_statement_watchers, ignore_string_escape_sequences=True)
-                evaluated_values.append((db_to_string(internal_value).value, (group_start_index, end_index + 1)))
+        for internal_expr, location in get_interpolated_expressions(val_string, symbol):
+            internal_value = evaluate_expression(internal_expr, namespaces, async_statements, when_statement_watchers, ignore_string_escape_sequences=True)
+            evaluated_values.append((db_to_string(internal_value).value, location))
 
         new_string = list(val_string)
         for replacement, (start, end) in reversed(evaluated_values):
@@ -453,129 +521,176 @@ def determine_non_name_value(val: Token) -> DreamberdValue:
         raise_error_at_line(filename, code, val.line, f"The value {retval.value} has been deleted.")
     return retval
 
-def is_approx_equal(left: DreamberdValue, right: DreamberdValue) -> DreamberdBoolean:
-
-    if is_really_really_equal(left, right).value:
-        return DreamberdBoolean(True)
-
-    if isinstance(left, DreamberdString) or isinstance(right, DreamberdString):
-
-        return DreamberdBoolean(SequenceMatcher(None, db_to_string(left).value, 
-                                                db_to_string(right).value).ratio() > STRING_EQUALITY_RATIO)
-
-    if isinstance((num := left), DreamberdNumber) or isinstance((num := right), DreamberdNumber):
-        other = left if right == num else right
-        if isinstance(other, (DreamberdNumber, DreamberdUndefined, DreamberdBoolean)):
-            left_num, right_num = db_to_number(left).value, db_to_number(right).value
-            return DreamberdBoolean(left_num == right_num or (False if left_num == 0 else (left_num - right_num) / left_num < NUM_EQUALITY_RATIO))
-
-    if isinstance(left, DreamberdBoolean) or isinstance(right, DreamberdBoolean):
-        left_bool, right_bool = db_to_boolean(left).value, db_to_boolean(right).value
-        if left_bool is None or right_bool is None:
-            return DreamberdBoolean(None)  # maybe
-        return DreamberdBoolean(left_bool == right_bool)
-
-    if (val := db_to_boolean(left).value) == db_to_boolean(right).value and val is not None:
-        return DreamberdBoolean(True)
-
-    if type(left) != type(right):
-        return DreamberdBoolean(None)  # maybe, programmer got too lazy
+def get_string_similarity(a: str, b: str) -> float:
+    """ difflib's ratio of matching characters, identical strings skip the matching entirely. """
+    if a == b:
+        return 1.0
+    return SequenceMatcher(None, a, b).ratio()
 
-    if isinstance(left, DreamberdList) and isinstance(right, DreamberdList):
-        if len(left.values) == len(right.values) == 0:
-            return DreamberdBoolean(True)
-        is_equals = [is_approx_equal(l, r) for l, r in zip(left.values, right.values)]
-        ratio = sum([int(x.value) if x.value is not None else 0.5 for x in is_equals]) / max(len(left.values), len(right.values))
-        return DreamberdBoolean(ratio > LIST_EQUALITY_RATIO)
-
-    if isinstance(left, DreamberdMap) and isinstance(right, DreamberdMap):
-        if len(left.self_dict) == len(right.self_dict) == 0:
-            return DreamberdBoolean(True)
-        is_equals = [is_approx_equal(left.self_dict[key], right.self_dict[key])
-                     for key in left.self_dict.keys() & right.self_dict.keys()]
-        ratio = sum([int(x.value) if x.value is not None else 0.5 for x in is_equals]) /                  \
-                len(left.self_dict.keys() | right.self_dict.keys())
-        return DreamberdBoolean(ratio > MAP_EQUALITY_RATIO)
+def is_equality_ratio_above(is_equals: Iterable[DreamberdBoolean], compared: int, total: int, threshold: float) -> bool:
+    """ 
+    Adds up the results of comparing elements, with true counting as 1 and maybe as 0.5, and checks if that divided by 
+    the total is above the threshold. The comparisons are lazy, so this stops as soon as the rest can't change the answer.
+    """
+    count = 0.0
+    for x in is_equals:
+        compared -= 1
+        if x.value:
+            count += 1
+        elif x.value is None:
+            count += 0.5
+        if count / total > threshold:
+            return True
+        if (count + compared) / total <= threshold:  # even if everything left is equal
+            return False
+    return count / total > threshold
+
+def approx_equal_strings(left: DreamberdValue, right: DreamberdValue) -> DreamberdBoolean:
+    return db_boolean(get_string_similarity(db_to_string(left).value, db_to_string(right).value) > STRING_EQUALITY_RATIO)
+
+def approx_equal_numbers(left: DreamberdValue, right: DreamberdValue) -> DreamberdBoolean:
+    left_num, right_num = db_to_number(left).value, db_to_number(right).value
+    return db_boolean(left_num == right_num or (False if left_num == 0 else (left_num - right_num) / left_num < NUM_EQUALITY_RATIO))
+
+def approx_equal_booleans(left: DreamberdValue, right: DreamberdValue) -> DreamberdBoolean:
+    left_bool, right_bool = db_to_boolean(left).value, db_to_boolean(right).value
+    if left_bool is None or right_bool is None:
+        return DB_MAYBE  # maybe
+    return db_boolean(left_bool == right_bool)
+
+def is_truthiness_equal(left: DreamberdValue, right: DreamberdValue) -> bool:
+    return (val := db_to_boolean(left).value) == db_to_boolean(right).value and val is not None
+
+# the rest all start by checking if both are true or both are false, which goes before anything else for these types
+def approx_equal_different_types(left: DreamberdValue, right: DreamberdValue) -> DreamberdBoolean:
+    if is_truthiness_equal(left, right):
+        return DB_TRUE
+    return DB_MAYBE  # maybe, programmer got too lazy
+
+def approx_equal_lists(left: DreamberdList, right: DreamberdList) -> DreamberdBoolean:
+    if is_truthiness_equal(left, right) or len(left.values) == len(right.values) == 0:
+        return DB_TRUE
+    return db_boolean(is_equality_ratio_above((is_approx_equal(l, r) for l, r in zip(left.values, right.values)), 
+                                              min(len(left.values), len(right.values)), max(len(left.values), len(right.values)), LIST_EQUALITY_RATIO))
+
+def approx_equal_maps(left: DreamberdMap, right: DreamberdMap) -> DreamberdBoolean:
+    if is_truthiness_equal(left, right) or len(left.self_dict) == len(right.self_dict) == 0:
+        return DB_TRUE
+    shared_keys = left.self_dict.keys() & right.self_dict.keys()
+    return db_boolean(is_equality_ratio_above((is_approx_equal(left.self_dict[key], right.self_dict[key]) for key in shared_keys), 
+                                              len(shared_keys), len(left.self_dict.keys() | right.self_dict.keys()), MAP_EQUALITY_RATIO))
+
+def approx_equal_functions(left: DreamberdFunction, right: DreamberdFunction) -> DreamberdBoolean:
+    if is_truthiness_equal(left, right) or len(left.code) == len(right.code) == 0:
+        return DB_TRUE
+    ratio = sum([len(set(l) | set(r)) / min(len(l), len(r)) for l, r in zip(left.code, right.code)]) / max(len(left.code), len(right.code))
+    return db_boolean(True if ratio > FUNCTION_EQUALITY_RATIO else None)  # for no reason whatsoever, this will be maybe and not False
+
+def approx_equal_objects(left: DreamberdObject, right: DreamberdObject) -> DreamberdBoolean:
+    if is_truthiness_equal(left, right) or len(left.namespace) == len(right.namespace) == 0:
+        return DB_TRUE
+    shared_keys = left.namespace.keys() & right.namespace.keys()
+    return db_boolean(is_equality_ratio_above((is_approx_equal(left.namespace[key].value, right.namespace[key].value) for key in shared_keys), 
+                                              len(shared_keys), len(left.namespace.keys() | right.namespace.keys()), OBJECT_EQUALITY_RATIO))
+
+def approx_equal_same_type(left: DreamberdValue, right: DreamberdValue) -> DreamberdBoolean:
+    if is_truthiness_equal(left, right):
+        return DB_TRUE
+    return DB_MAYBE
+
+APPROX_EQUAL_SAME_TYPE_FUNCTIONS: dict[type, Callable[[Any, Any], DreamberdBoolean]] = {
+    DreamberdList: approx_equal_lists,
+    DreamberdMap: approx_equal_maps,
+    DreamberdFunction: approx_equal_functions,
+    DreamberdObject: approx_equal_objects,
+}
+
+def get_approx_equal_function(left_type: type, right_type: type) -> Callable[[Any, Any], DreamberdBoolean]:
+    """ Which comparison gets used only depends on the two types, so it is worked out once per pair of types. """
+    if left_type is DreamberdString or right_type is DreamberdString:
+        return approx_equal_strings
+    if left_type is DreamberdNumber or right_type is DreamberdNumber:
+        if (right_type if left_type is DreamberdNumber else left_type) in (DreamberdNumber, DreamberdUndefined, DreamberdBoolean):
+            return approx_equal_numbers
+    if left_type is DreamberdBoolean or right_type is DreamberdBoolean:
+        return approx_equal_booleans
+    if left_type is not right_type:
+        return approx_equal_different_types
+    return APPROX_EQUAL_SAME_TYPE_FUNCTIONS.get(left_type, approx_equal_same_type)
+
+# (type of left, type of right) -> the function that compares them, filled in as new pairs of types come up
+approx_equal_functions_by_types: dict[tuple[type, type], Callable[[Any, Any], DreamberdBoolean]] = {}
 
-    if isinstance(left, DreamberdFunction) and isinstance(right, DreamberdFunction):
-        if len(left.code) == len(right.code) == 0:
-            return DreamberdBoolean(True)
-        ratio = sum([len(set(l) | set(r)) / min(len(l), len(r)) for l, r in zip(left.code, right.code)]) / max(len(left.code), len(right.code))
-        return DreamberdBoolean(True if ratio > FUNCTION_EQUALITY_RATIO else None)  # for no reason whatsoever, this will be maybe and not False
+def is_approx_equal(left: DreamberdValue, right: DreamberdValue) -> DreamberdBoolean:
 
-    if isinstance(left, DreamberdObject) and isinstance(right, DreamberdObject):
-        if len(left.namespace) == len(right.namespace) == 0:
-            return DreamberdBoolean(True)
-        is_equals = [is_approx_equal(left.namespace[key].value, right.namespace[key].value)
-                     for key in left.namespace.keys() & right.namespace.keys()]
-        ratio = sum([int(x.value) if x.value is not None else 0.5 for x in is_equals]) /                  \
-                len(left.namespace.keys() | right.namespace.keys())
-        return DreamberdBoolean(ratio > OBJECT_EQUALITY_RATIO)
+    if left is right:
+        return DB_TRUE
 
-    return DreamberdBoolean(None)
+    if (compare := approx_equal_functions_by_types.get(types := (type(left), type(right)))) is None:
+        compare = approx_equal_functions_by_types[types] = get_approx_equal_function(*types)
+    return compare(left, right)
 
 def is_equal(left: DreamberdValue, right: DreamberdValue) -> DreamberdBoolean:
 
     if isinstance(left, DreamberdString) or isinstance(right, DreamberdString):
-        return DreamberdBoolean(db_to_string(left).value == db_to_string(right).value)
+        return db_boolean(db_to_string(left).value == db_to_string(right).value)
 
     if isinstance(left, DreamberdNumber) or isinstance(right, DreamberdNumber):
-        return DreamberdBoolean(db_to_number(left).value == db_to_number(right).value)
+        return db_boolean(db_to_number(left).value == db_to_number(right).value)
 
     if isinstance(left, DreamberdBoolean) or isinstance(right, DreamberdBoolean):
         left_bool, right_bool = db_to_boolean(left).value, db_to_boolean(right).value
         if left_bool is None or right_bool is None:
-            return DreamberdBoolean(None)  # maybe
-        return DreamberdBoolean(left_bool == right_bool)
+            return DB_MAYBE  # maybe
+        return db_boolean(left_bool == right_bool)
 
     if (val := db_to_boolean(left).value) == db_to_boolean(right).value and val is not None:
-        return DreamberdBoolean(True)
+        return DB_TRUE
 
     if type(left) != type(right):
-        return DreamberdBoolean(None)  # maybe, programmer got too lazy
+        return DB_MAYBE  # maybe, programmer got too lazy
 
     if isinstance(left, DreamberdList) and isinstance(right, DreamberdList):
-        return DreamberdBoolean(all([is_equal(l, r).value for l, r in zip(left.values, right.values)]))
+        return db_boolean(all(is_equal(l, r).value for l, r in zip(left.values, right.values)))
 
     if isinstance(left, DreamberdMap) and isinstance(right, DreamberdMap):
         is_equals = [is_approx_equal(left.self_dict[key], right.self_dict[key]).value 
                      for key in left.self_dict.keys() & right.self_dict.keys()]
-        return DreamberdBoolean(all(is_equals))
+        return db_boolean(all(is_equals))
 
     if isinstance(left, DreamberdObject) and isinstance(right, DreamberdObject):
         is_equals = [is_approx_equal(left.namespace[key].value, right.namespace[key].value).value 
                      for key in left.namespace.keys() & right.namespace.keys()]
-        return DreamberdBoolean(all(is_equals))
+        return db_boolean(all(is_equals))
 
-    return DreamberdBoolean(None)
+    return DB_MAYBE
 
 def is_really_equal(left: DreamberdValue, right: DreamberdValue) -> DreamberdBoolean:
     if type(left) != type(right):
-        return DreamberdBoolean(False)
+        return DB_FALSE
     match left, right:  # i know these are horribly verbose but if i don't do this my LSP yells at me
         case (DreamberdNumber(), DreamberdNumber()) | \
              (DreamberdString(), DreamberdString()) | \
              (DreamberdBoolean(), DreamberdBoolean()) | \
              (DreamberdKeyword(), DreamberdKeyword()): 
-            return DreamberdBoolean(left.value == right.value)
+            return db_boolean(left.value == right.value)
         case (DreamberdUndefined(), DreamberdUndefined()):
-            return DreamberdBoolean(True) 
+            return DB_TRUE 
         case (DreamberdObject(), DreamberdObject()):
-            return DreamberdBoolean(left.class_name == right.class_name and 
+            return db_boolean(left.class_name == right.class_name and 
                                     left.namespace.keys() == right.namespace.keys() and 
                                     all([is_really_equal(left.namespace[k].value, right.namespace[k].value).value for k in left.namespace.keys()]))
         case (DreamberdFunction(), DreamberdFunction()):
-            return DreamberdBoolean(all([getattr(left, name) == getattr(right, name) for name in ["code", "args", "is_async"]]))
+            # the code is compared last and only if everything else matches, because that is a deep compare of every statement
+            return db_boolean(left is right or (left.is_async == right.is_async and left.args == right.args and
+                                                (left.code is right.code or left.code == right.code)))
         case (DreamberdList(), DreamberdList()):
-            return DreamberdBoolean(len(left.values) == len(right.values) and 
+            return db_boolean(len(left.values) == len(right.values) and 
                                     all([is_really_equal(l, r).value for l, r in zip(left.values, right.values)]))
         case (DreamberdMap(), DreamberdMap()):
-            return DreamberdBoolean(left.self_dict.keys() == right.self_dict.keys() and 
+            return db_boolean(left.self_dict.keys() == right.self_dict.keys() and 
                                     all([is_really_equal(left.self_dict[k], right.self_dict[k]).value for k in left.self_dict]))
-    return DreamberdBoolean(None)
-
-def is_really_really_equal(left: DreamberdValue, right: DreamberdValue) -> DreamberdBoolean:
-    return DreamberdBoolean(left is right)
+    return DB_MAYBE
 
 def is_less_than(left: DreamberdValue, right: DreamberdValue) -> DreamberdBoolean:
     if type(left) != type(right):
@@ -585,19 +700,19 @@ def is_less_than(left: DreamberdValue, right: DreamberdValue) -> DreamberdBoolea
              (DreamberdString(), DreamberdString()) | \
              (DreamberdBoolean(), DreamberdBoolean()):
             if isinstance(left, DreamberdBoolean) and isinstance(right, DreamberdBoolean) and (left.value is None or right.value is None):
-                return DreamberdBoolean(None)
-            return DreamberdBoolean(left.value < right.value)   # type: ignore
+                return DB_MAYBE
+            return db_boolean(left.value < right.value)   # type: ignore
         case (DreamberdUndefined(), DreamberdUndefined()):
-            return DreamberdBoolean(False)
+            return DB_FALSE
         case (DreamberdList(), DreamberdList()):
-            return DreamberdBoolean(len(left.values) < len(right.values))
+            return db_boolean(len(left.values) < len(right.values))
         case (DreamberdMap(), DreamberdMap()):
-            return DreamberdBoolean(len(left.self_dict) < len(right.self_dict))
+            return db_boolean(len(left.self_dict) < len(right.self_dict))
         case (DreamberdKeyword(), DreamberdKeyword()) | \
              (DreamberdObject(), DreamberdObject()) | \
              (DreamberdFunction(), DreamberdFunction()):
             raise_error_at_line(filename, code, current_line, f"Comparison not supported between elements of type {type(left).__name__}.")
-    return DreamberdBoolean(None)
+    return DB_MAYBE
 
 def perform_single_value_operation(val: DreamberdValue, operator_token: Token) -> DreamberdValue: 
     match operator_token.type:
@@ -613,87 +728,115 @@ def perform_single_value_operation(val: DreamberdValue, operator_token: Token) -
                     raise_error_at_token(filename, code, f"Cannot negate a value of type {type(val).__name__}", operator_token)
         case TokenType.SEMICOLON:
             val_bool = db_to_boolean(val)
-            return db_not(val_bool) 
+            return DreamberdBoolean(db_not(val_bool).value)  # a new value, same as the comparisons below
     raise_error_at_token(filename, code, "Something went wrong. My bad.", operator_token)
 
+# the arithmetic checks for two plain numbers first, which is by far the most common case and needs no conversions
+def perform_addition(left: DreamberdValue, right: DreamberdValue) -> DreamberdValue:
+    if type(left) is DreamberdNumber and type(right) is DreamberdNumber:
+        return DreamberdNumber(left.value + right.value)
+    if type(left) is DreamberdString and type(right) is DreamberdString:
+        return DreamberdString(left.value + right.value)
+    if isinstance(left, DreamberdString) or isinstance(right, DreamberdString):
+        return DreamberdString(db_to_string(left).value + db_to_string(right).value)
+    return DreamberdNumber(db_to_number(left).value + db_to_number(right).value)
+
+def perform_subtraction(left: DreamberdValue, right: DreamberdValue) -> DreamberdValue:
+    if type(left) is DreamberdNumber and type(right) is DreamberdNumber:
+        return DreamberdNumber(left.value - right.value)
+    return DreamberdNumber(db_to_number(left).value - db_to_number(right).value)
+
+def perform_multiplication(left: DreamberdValue, right: DreamberdValue) -> DreamberdValue:
+    if type(left) is DreamberdNumber and type(right) is DreamberdNumber:
+        return DreamberdNumber(left.value * right.value)
+    return DreamberdNumber(db_to_number(left).value * db_to_number(right).value)
+
+def perform_division(left: DreamberdValue, right: DreamberdValue) -> DreamberdValue:
+    if type(left) is DreamberdNumber and type(right) is DreamberdNumber:
+        left_num, right_num = left.value, right.value
+    else:
+        left_num, right_num = db_to_number(left).value, db_to_number(right).value
+    if abs(right_num) < FLOAT_TO_INT_PREC:  # pretty much zero
+        return DreamberdUndefined()
+    return DreamberdNumber(left_num / right_num)
+
+def perform_exponentiation(left: DreamberdValue, right: DreamberdValue) -> DreamberdValue:
+    if type(left) is DreamberdNumber and type(right) is DreamberdNumber:
+        left_num, right_num = left.value, right.value
+    else:
+        left_num, right_num = db_to_number(left).value, db_to_number(right).value
+    if left_num < -FLOAT_TO_INT_PREC and not is_int(right_num):
+        raise_error_at_line(filename, code, current_line, "Cannot raise a negative base to a non-integer exponent.")
+    return DreamberdNumber(pow(left_num, right_num))
+
+def perform_or(left: DreamberdValue, right: DreamberdValue) -> DreamberdValue:
+    match db_to_boolean(left).value, db_to_boolean(right).value:
+        case True, _:     return left    # yes 
+        case False, _:    return right   # depends
+        case None, True:  return right   # yes
+        case None, False: return left    # maybe?
+        case _:           return left if random.random() < 0.50 else right   # maybe? 
+
+def perform_and(left: DreamberdValue, right: DreamberdValue) -> DreamberdValue:
+    match db_to_boolean(left).value, db_to_boolean(right).value:
+        case True, _:     return right   # depends
+        case False, _:    return left    # nope
+        case None, True:  return left    # maybe?
+        case None, False: return right   # nope
+        case _:           return left if random.random() < 0.50 else right  # maybe? 
+
+def is_really_really_equal(left: DreamberdValue, right: DreamberdValue) -> DreamberdBoolean:
+    return db_boolean(left is right)  # really really equal is just an identity check
+
+def is_less_or_equal(left: DreamberdValue, right: DreamberdValue) -> DreamberdBoolean:
+    is_eq = is_really_equal(left, right).value
+    is_le = False
+    match is_eq, is_less_than(left, right).value:  # performs the OR operation
+        case (True, _) | (_, True): is_le = True
+        case (None, _) | (_, None): is_le = None 
+    return db_boolean(is_le)
+
+# i'm gonna call this lasagna code because it's stacked like lasagna and looks stupid
+# (it used to be one big match statement, now the operator just picks the function out of here)
+TWO_VALUE_OPERATIONS: dict[OperatorType, Callable[[DreamberdValue, DreamberdValue], DreamberdValue]] = {
+    OperatorType.ADD:  perform_addition,
+    OperatorType.SUB:  perform_subtraction,
+    OperatorType.MUL:  perform_multiplication,
+    OperatorType.DIV:  perform_division,
+    OperatorType.EXP:  perform_exponentiation,
+    OperatorType.OR:   perform_or,
+    OperatorType.AND:  perform_and,
+    OperatorType.E:    is_approx_equal,
+    OperatorType.EE:   is_equal,
+    OperatorType.NE:   lambda left, right: db_not(is_equal(left, right)),
+    OperatorType.EEE:  is_really_equal,
+    OperatorType.NEE:  lambda left, right: db_not(is_really_equal(left, right)),
+    OperatorType.EEEE: is_really_really_equal,
+    OperatorType.NEEE: lambda left, right: db_boolean(left is not right),
+    OperatorType.LT:   is_less_than,
+    OperatorType.GE:   lambda left, right: db_not(is_less_than(left, right)),
+    OperatorType.LE:   is_less_or_equal,
+    OperatorType.GT:   lambda left, right: db_not(is_less_or_equal(left, right)),
+}
+
+# the comparisons use the shared true, false and maybe among themselves, but the result that the program gets has to be 
+# a new value every time, otherwise `(1 == 1) ==== true` would be true
+COMPARISON_OPERATORS = frozenset({OperatorType.E, OperatorType.EE, OperatorType.NE, OperatorType.EEE, OperatorType.NEE, OperatorType.EEEE,
+                                  OperatorType.NEEE, OperatorType.LT, OperatorType.GE, OperatorType.LE, OperatorType.GT})
+
 def perform_two_value_operation(left: DreamberdValue, right: DreamberdValue, operator: OperatorType, operator_token: Token) -> DreamberdValue:
-    match operator:
-        case OperatorType.ADD:
-            if isinstance(left, DreamberdString) or isinstance(right, DreamberdString):
-                return DreamberdString(db_to_string(left).value + db_to_string(right).value)
-            left_num = db_to_number(left)
-            right_num = db_to_number(right)
-            return DreamberdNumber(left_num.value + right_num.value)
-        case OperatorType.SUB | OperatorType.MUL | OperatorType.DIV | OperatorType.EXP:
-            left_num = db_to_number(left)
-            right_num = db_to_number(right)
-            if operator == OperatorType.DIV and abs(right_num.value) < FLOAT_TO_INT_PREC: # pretty much zero
-                return DreamberdUndefined() 
-            elif operator == OperatorType.EXP and left_num.value < -FLOAT_TO_INT_PREC and not is_int(right_num.value):
-                raise_error_at_line(filename, code, current_line, "Cannot raise a negative base to a non-integer exponent.")
-            match operator:
-                case OperatorType.SUB: result = left_num.value - right_num.value
-                case OperatorType.MUL: result = left_num.value * right_num.value
-                case OperatorType.DIV: result = left_num.value / right_num.value
-                case OperatorType.EXP: result = pow(left_num.value, right_num.value)
-            return DreamberdNumber(result)
-        case OperatorType.OR:
-            left_bool = db_to_boolean(left)
-            right_bool = db_to_boolean(right) 
-            match left_bool.value, right_bool.value:
-                case True, _:     return left    # yes 
-                case False, _:    return right   # depends
-                case None, True:  return right   # yes
-                case None, False: return left    # maybe?
-                case None, None:  return left if random.random() < 0.50 else right   # maybe? 
-        case OperatorType.AND:  
-            left_bool = db_to_boolean(left)
-            right_bool = db_to_boolean(right) 
-            match left_bool.value, right_bool.value:
-                case True, _:     return right   # depends
-                case False, _:    return left    # nope
-                case None, True:  return left    # maybe?
-                case None, False: return right   # nope
-                case None, None:  return left if random.random() < 0.50 else right  # maybe? 
-        case OperatorType.E: 
-            return is_approx_equal(left, right)
-
-        # i'm gonna call this lasagna code because it's stacked like lasagna and looks stupid
-        case OperatorType.EE | OperatorType.NE:
-            if operator == OperatorType.EE:
-                return is_equal(left, right)
-            return db_not(is_equal(left, right))
-        case OperatorType.EEE | OperatorType.NEE:
-            if operator == OperatorType.EEE:
-                return is_really_equal(left, right)
-            return db_not(is_really_equal(left, right))
-        case OperatorType.EEEE | OperatorType.NEEE:
-            if operator == OperatorType.EEEE:
-                return is_really_really_equal(left, right)
-            return db_not(is_really_really_equal(left, right))
-        case OperatorType.GT | OperatorType.LE:
-            is_eq = is_really_equal(left, right)
-            is_less = is_less_than(left, right)
-            is_le = False
-            match is_eq.value, is_less.value:  # performs the OR operation
-                case (True, _) | (_, True): is_le = True
-                case (None, _) | (_, None): is_le = None 
-            if operator == OperatorType.LE:
-                return DreamberdBoolean(is_le)
-            return db_not(DreamberdBoolean(is_le))
-        case OperatorType.LT | OperatorType.GE:  
-            if operator == OperatorType.LT:
-                return is_less_than(left, right)
-            return db_not(is_less_than(left, right))
-
-    raise_error_at_token(filename, code, "Something went wrong here.", operator_token)
+    if (operation := TWO_VALUE_OPERATIONS.get(operator)) is None:
+        raise_error_at_token(filename, code, "Something went wrong here.", operator_token)
+    if operator in COMPARISON_OPERATORS:
+        return DreamberdBoolean(operation(left, right).value)
+    return operation(left, right)
 
 def get_value_from_namespaces(name_or_value: Token, namespaces: list[Namespace]) -> DreamberdValue:
 
     # what the frick am i doing rn
     if v := get_name_from_namespaces(name_or_value.value, namespaces):
         if isinstance(v.value, DreamberdPromise):
-            return deepcopy(get_value_from_promise(v.value))  # consider not deepcopying this but it doesnt really matter
+            return copy_value(get_value_from_promise(v.value))
         return v.value
     return determine_non_name_value(name_or_value)
 
@@ -717,117 +860,158 @@ def print_expression_debug(debug: int, expr: Union[list[Token], ExpressionTreeNo
     else: debug_print_no_token(filename, msg)
 
 
+def check_deleted_value(val: DreamberdValue) -> DreamberdValue:
+    if isinstance(val, (DreamberdNumber, DreamberdString)) and val in deleted_values:
+        raise_error_at_line(filename, code, current_line, f"The value {val.value} has been deleted.")
+    return val
+
+def call_function(expr: FunctionNode, func: Union[DreamberdFunction, BuiltinFunction], caller: Optional[str], args: list[DreamberdValue], namespaces: list[Namespace], async_statements: AsyncStatements, when_statement_watchers: WhenStatementWatchers) -> DreamberdValue:
+    """ Calls builtins and starts async functions, the blank caller argument has already been taken out of the args. """
+    if isinstance(func, DreamberdFunction):
+        register_async_function(expr, func, namespaces, args, async_statements)
+        return DreamberdUndefined()
+    elif func.modifies_caller:  # special cases where the function itself modifies the caller
+        if caller:  # seems like a needless check but it makes the errors go away
+            caller_var = get_name_from_namespaces(caller, namespaces)
+            if isinstance(caller_var, Variable) and not caller_var.can_edit_value:
+                raise_error_at_line(filename, code, current_line, "Cannot edit the value of this variable.")
+
+        retval = evaluate_builtin_function(expr, func, args)
+        when_watchers = get_code_from_when_statement_watchers(id(args[0]), when_statement_watchers)
+        for when_watcher in when_watchers:  # i just wanna be done with this :(
+            condition, inside_statements = when_watcher
+            condition_val = evaluate_expression(condition, namespaces, async_statements, when_statement_watchers)
+            execute_conditional(condition_val, inside_statements, namespaces, when_statement_watchers)
+        return retval
+
+    return evaluate_builtin_function(expr, func, args)
+
+# pushed in place of a function when evaluating "await", so that the awaited call knows to run synchronously
+AWAIT_MARKER = object()
+
 def evaluate_expression(expr: Union[list[Token], ExpressionTreeNode], namespaces: list[dict[str, Union[Variable, Name]]], async_statements: AsyncStatements, when_statement_watchers: WhenStatementWatchers, *, ignore_string_escape_sequences: bool = False) -> DreamberdValue:
-    """ Wrapper for the evaluate_expression_for_real function that checks deleted values on each run. """
-    retval = evaluate_expression_for_real(expr, namespaces, async_statements, when_statement_watchers, ignore_string_escape_sequences)
-    if isinstance(retval, (DreamberdNumber, DreamberdString)) and retval in deleted_values:
-        raise_error_at_line(filename, code, current_line, f"The value {retval.value} has been deleted.")
-    return retval
+    """ 
+    Runs the bytecode of an expression (see processor/bytecode.py) on a stack. 
+    Every value that gets pushed is checked against the deleted values, same as if each node was evaluated on its own.
+    """
 
-def evaluate_expression_for_real(expr: Union[list[Token], ExpressionTreeNode], namespaces: list[dict[str, Union[Variable, Name]]], async_statements: AsyncStatements, when_statement_watchers: WhenStatementWatchers, ignore_string_escape_sequences: bool) -> DreamberdValue:
+    bytecode, consts = get_compiled_expression(get_built_expression(expr))
+    stack: list = []
+    pc, code_len = 0, len(bytecode)
+    while pc < code_len:
+        op, arg = bytecode[pc], bytecode[pc + 1]
+        pc += 2
 
-    expr = get_built_expression(expr)
-    match expr:
-        case FunctionNode():  # done :)
-            
-            # for a function, the thing must be in the namespace
-            func = get_name_from_namespaces(expr.name.value, namespaces)
+        if op == LOAD_NAME:
+            stack.append(check_deleted_value(get_value_from_namespaces(consts[arg], namespaces)))
+
+        elif op == LOAD_NUMBER:
+            node, number = consts[arg]
+            if deleted_values or get_name_from_namespaces(node.name_or_value.value, namespaces) is not None:
+                stack.append(check_deleted_value(get_value_from_namespaces(node.name_or_value, namespaces)))
+            else:
+                stack.append(DreamberdNumber(number))
+
+        elif op == FOLD:
+            fold = consts[arg]
+            node, left, right, end = fold[0], fold[1], fold[2], fold[3]
+            if not deleted_values and get_name_from_namespaces(left.name_or_value.value, namespaces) is None and \
+               get_name_from_namespaces(right.name_or_value.value, namespaces) is None:
+                if fold[4] is None:
+                    fold[4] = perform_two_value_operation(determine_non_name_value(left.name_or_value), determine_non_name_value(right.name_or_value), node.operator, node.operator_token)
+                stack.append(copy_value(fold[4]))
+                pc = end
+
+        elif op == BINOP:
+            right = stack.pop()
+            node = consts[arg]
+            stack[-1] = check_deleted_value(perform_two_value_operation(stack[-1], right, node.operator, node.operator_token))
+
+        elif op == LOAD_FUNC:
+            call_expr, end, _, _ = consts[arg]
+            is_awaited = bool(stack) and stack[-1] is AWAIT_MARKER
+            func = get_name_from_namespaces(call_expr.name.value, namespaces)
 
             # make sure it exists and it is actually a function in the namespace
             if func is None:
-                raise_error_at_token(filename, code, "Cannot find token in namespace.", expr.name)
+                raise_error_at_token(filename, code, "Cannot find token in namespaces." if is_awaited else "Cannot find token in namespace.", call_expr.name)
     
             # check the thing in the await symbol. if awaiting a single function that is async, evaluate it as not async
-            force_execute_sync = False
-            if isinstance(func.value, DreamberdKeyword):
+            if isinstance(func.value, DreamberdKeyword) and not is_awaited:
                 if func.value.value == "await":
-                    if len(expr.args) != 1:
-                        raise_error_at_token(filename, code, "Expected only one argument for await function.", expr.name)
-                    if not isinstance(expr.args[0], FunctionNode):
-                        raise_error_at_token(filename, code, "Expected argument of await function to be a function call.", expr.name)
-                    force_execute_sync = True 
-                    
-                    # check for None again
-                    expr = expr.args[0]
-                    func = get_name_from_namespaces(expr.name.value, namespaces)
-                    if func is None:  # the other check happens in the next statement
-                        raise_error_at_token(filename, code, "Cannot find token in namespaces.", expr.name)
+                    if len(call_expr.args) != 1:
+                        raise_error_at_token(filename, code, "Expected only one argument for await function.", call_expr.name)
+                    if not isinstance(call_expr.args[0], FunctionNode):
+                        raise_error_at_token(filename, code, "Expected argument of await function to be a function call.", call_expr.name)
+                    stack.append(AWAIT_MARKER)  # the next instruction loads the awaited function
+                    continue
 
                 elif func.value.value == "previous":
-                    if len(expr.args) != 1:
-                        raise_error_at_token(filename, code, "Expected only one argument for previous function.", expr.name)
-                    if not isinstance(expr.args[0], ValueNode):
-                        raise_error_at_token(filename, code, "Expected argument of previous function to be a variable.", expr.name)
-                    force_execute_sync = True 
-                    
-                    # check for None again
-                    val = get_name_from_namespaces(expr.args[0].name_or_value.value, namespaces)
+                    if len(call_expr.args) != 1:
+                        raise_error_at_token(filename, code, "Expected only one argument for previous function.", call_expr.name)
+                    if not isinstance(call_expr.args[0], ValueNode):
+                        raise_error_at_token(filename, code, "Expected argument of previous function to be a variable.", call_expr.name)
+                    val = get_name_from_namespaces(call_expr.args[0].name_or_value.value, namespaces)
                     if not isinstance(val, Variable):
-                        raise_error_at_token(filename, code, "Expected argument of previous function to be a defined variable.", expr.args[0].name_or_value)
-                    return val.prev_values[-1]
+                        raise_error_at_token(filename, code, "Expected argument of previous function to be a defined variable.", call_expr.args[0].name_or_value)
+                    stack.append(check_deleted_value(val.prev_values[-1]))
+                    pc = end  # the argument is never evaluated
+                    continue
 
             if not isinstance(func.value, (BuiltinFunction, DreamberdFunction)):
-                raise_error_at_token(filename, code, "Attempted function call on non-function value.", expr.name)
-            
-            caller = None
-            if len(name_split := expr.name.value.split('.')) > 1:
-                caller = '.'.join(name_split[:-1])
-                expr = deepcopy(expr)   # we create a copy of the expression as to not modify it badly
-                expr.args.insert(0, ValueNode(Token(TokenType.NAME, caller, expr.name.line, expr.name.col)))  # artificially put this here, as this is the imaginary "this" 
-            args = [evaluate_expression(arg, namespaces, async_statements, when_statement_watchers) for arg in expr.args]
+                raise_error_at_token(filename, code, "Attempted function call on non-function value.", call_expr.name)
+            stack.append(func.value)
+
+        elif op == CALL:
+            call_expr, _, arg_count, caller = consts[arg]
+            args = stack[len(stack) - arg_count:]
+            del stack[len(stack) - arg_count:]
+            func = stack.pop()
+            if func is AWAIT_MARKER:  # the awaited call already left its value on the stack
+                stack.append(check_deleted_value(args[0]))
+                continue
+            force_execute_sync = bool(stack) and stack[-1] is AWAIT_MARKER
             if isinstance(args[0], DreamberdSpecialBlankValue):
                 args = args[1:]
-            if isinstance(func.value, DreamberdFunction) and func.value.is_async and not force_execute_sync:
-                register_async_function(expr, func.value, namespaces, args, async_statements)
-                return DreamberdUndefined()
-            elif isinstance(func.value, BuiltinFunction) and func.value.modifies_caller:  # special cases where the function itself modifies the caller
-                if caller:  # seems like a needless check but it makes the errors go away
-                    caller_var = get_name_from_namespaces(caller, namespaces)
-                    if isinstance(caller_var, Variable) and not caller_var.can_edit_value:
-                        raise_error_at_line(filename, code, current_line, "Cannot edit the value of this variable.")
-
-                retval = evaluate_normal_function(expr, func.value, namespaces, args, when_statement_watchers)
-                when_watchers = get_code_from_when_statement_watchers(id(args[0]), when_statement_watchers)
-                for when_watcher in when_watchers:  # i just wanna be done with this :(
-                    condition, inside_statements = when_watcher
-                    condition_val = evaluate_expression(condition, namespaces, async_statements, when_statement_watchers)
-                    execute_conditional(condition_val, inside_statements, namespaces, when_statement_watchers)
-                return retval
-
-            return evaluate_normal_function(expr, func.value, namespaces, args, when_statement_watchers)
-
-        case ListNode():  # done :) 
-            return DreamberdList([evaluate_expression(x, namespaces, async_statements, when_statement_watchers) for x in expr.values])
-
-        case ValueNode():  # done :)
-            if expr.name_or_value.type == TokenType.STRING: 
-                retval = interpret_formatted_string(expr.name_or_value, namespaces, async_statements, when_statement_watchers)
-                if not ignore_string_escape_sequences:
-                    return evaluate_escape_sequences(retval)
-                return retval
-            return get_value_from_namespaces(expr.name_or_value, namespaces)
-
-        case IndexNode():  # done :)
-            value = evaluate_expression(expr.value, namespaces, async_statements, when_statement_watchers)
-            index = evaluate_expression(expr.index, namespaces, async_statements, when_statement_watchers)
+
+            # user functions that run right away are run here rather than in call_function, every python frame 
+            # saved here is one less per level of recursion in the dreamberd code
+            if isinstance(func, DreamberdFunction) and (force_execute_sync or not func.is_async):
+                retval = interpret_code_statements(func.code, namespaces + [get_function_namespace(call_expr, func, args)], [], when_statement_watchers + [{}])
+                stack.append(check_deleted_value(retval or DreamberdUndefined()))
+            else:
+                stack.append(check_deleted_value(call_function(call_expr, func, caller, args, namespaces, async_statements, when_statement_watchers)))
+
+        elif op == JUMP_IF_TRUE:  # handle short curcuiting for True or __
+            if db_to_boolean(stack[-1]).value == True:
+                pc = arg
+
+        elif op == JUMP_IF_FALSE:  # handle short curcuiting for False and __
+            if db_to_boolean(stack[-1]).value == False:
+                pc = arg
+
+        elif op == LOAD_STRING:
+            val = interpret_formatted_string(consts[arg], namespaces, async_statements, when_statement_watchers)
+            if not ignore_string_escape_sequences or code_len != 2:  # only applies when the string is the whole expression
+                val = evaluate_escape_sequences(val)
+            stack.append(check_deleted_value(val))
+
+        elif op == INDEX:
+            index = stack.pop()
+            value = stack[-1]
             if not isinstance(value, DreamberdIndexable):
                 raise_error_at_line(filename, code, current_line, "Attempting to index a value that is not indexable.")
-            return value.access_index(index)
+            stack[-1] = check_deleted_value(value.access_index(index))
 
-        case ExpressionNode():  # done :)
-            left = evaluate_expression(expr.left, namespaces, async_statements, when_statement_watchers)
-            if db_to_boolean(left).value == True and expr.operator == OperatorType.OR:   # handle short curcuiting for True or __
-                return left
-            elif db_to_boolean(left).value == False and expr.operator == OperatorType.AND:   # handle short curcuiting for False and __
-                return left
-            right = evaluate_expression(expr.right, namespaces, async_statements, when_statement_watchers)
-            return perform_two_value_operation(left, right, expr.operator, expr.operator_token)
+        elif op == BUILD_LIST:
+            values = stack[len(stack) - arg:]
+            del stack[len(stack) - arg:]
+            stack.append(DreamberdList(values))
 
-        case SingleOperatorNode():
-            val = evaluate_expression(expr.expression, namespaces, async_statements, when_statement_watchers)
-            return perform_single_value_operation(val, expr.operator)
+        elif op == UNARY:
+            stack[-1] = check_deleted_value(perform_single_value_operation(stack[-1], consts[arg]))
 
-    return DreamberdUndefined()
+    return stack[-1] if stack else DreamberdUndefined()
 
 def handle_next_expressions(expr: ExpressionTreeNode, namespaces: list[Namespace]) -> tuple[ExpressionTreeNode, set[tuple[str, int]], set[str]]:
 
@@ -844,90 +1028,85 @@ def handle_next_expressions(expr: ExpressionTreeNode, namespaces: list[Namespace
 
     normal_nexts: set[tuple[str, int]] = set()
     async_nexts: set[str] = set()
-    inner_nexts: list[tuple[set[tuple[str, int]], set[str]]] = []
-    match expr:
-        case FunctionNode():
 
-            func = get_name_from_namespaces(expr.name.value, namespaces)
-            if func is None:
-                raise_error_at_token(filename, code, "Attempted function call on undefined variable.", expr.name)
-
-            # check if it is a next or await 
-            is_next = is_await = False   # i don't need this but it makes my LSP stop crying so it's here
-            if isinstance(func.value, DreamberdKeyword) and \
-               ((is_next := func.value.value == "next") or (is_await := func.value.value == "await")):
-
-                if is_next:
-
-                    # add it to list of things to watch for and change the returned expression to the name being next-ed
-                    if len(expr.args) != 1 or not isinstance(expr.args[0], ValueNode):
-                        raise_error_at_token(filename, code, "\"Next\"keyword can only take a single value as an argument.", expr.name)
-                    name = expr.args[0].name_or_value.value
-                    _, ns = get_name_and_namespace_from_namespaces(name, namespaces)
-                    if not ns:
-                        raise_error_at_line(filename, code, current_line, "Attempted to access namespace of a value without a namespace.")
-                    last_name = name.split('.')[-1]
-                    normal_nexts.add((name, id(ns)))
-                    expr = expr.args[0]
-                    expr.name_or_value.value = get_modified_next_name(last_name, id(ns))
-
-                elif is_await:
-
-                    if len(expr.args) != 1 or not isinstance(expr.args[0], FunctionNode):
-                        raise_error_at_token(filename, code, "Can only await a function.", expr.name)
-                    inner_expr = expr.args[0]
-                        
-                    func = get_name_from_namespaces(expr.args[0].name.value, namespaces)
-                    if func is None:
-                        raise_error_at_token(filename, code, "Attempted function call on undefined variable.", expr.name)
-
-                    if isinstance(func.value, DreamberdKeyword) and func.value.value == "next":
-                        if len(inner_expr.args) != 1 or not isinstance(inner_expr.args[0], ValueNode):
-                            raise_error_at_token(filename, code, "\"Next\"keyword can only take a single value as an argument.", inner_expr.name)
-                        name = inner_expr.args[0].name_or_value.value 
+    # a "next" only ever replaces its own node, so the tree is walked with a stack instead of recursing, where each entry 
+    # remembers what holds the node (a list of nodes, or a node and the attribute name) so it can be swapped out
+    root = expr
+    to_visit: list[tuple[ExpressionTreeNode, Union[list[ExpressionTreeNode], ExpressionTreeNode, None], Union[int, str]]] = [(expr, None, 0)]
+    while to_visit:
+        node, holder, key = to_visit.pop()
+        replacement = None
+        match node:
+            case FunctionNode():
+
+                func = get_name_from_namespaces(node.name.value, namespaces)
+                if func is None:
+                    raise_error_at_token(filename, code, "Attempted function call on undefined variable.", node.name)
+
+                # check if it is a next or await 
+                is_next = is_await = False   # i don't need this but it makes my LSP stop crying so it's here
+                if isinstance(func.value, DreamberdKeyword) and \
+                   ((is_next := func.value.value == "next") or (is_await := func.value.value == "await")):
+
+                    if is_next:
+
+                        # add it to list of things to watch for and change the returned expression to the name being next-ed
+                        if len(node.args) != 1 or not isinstance(node.args[0], ValueNode):
+                            raise_error_at_token(filename, code, "\"Next\"keyword can only take a single value as an argument.", node.name)
+                        name = node.args[0].name_or_value.value
                         _, ns = get_name_and_namespace_from_namespaces(name, namespaces)
                         if not ns:
                             raise_error_at_line(filename, code, current_line, "Attempted to access namespace of a value without a namespace.")
                         last_name = name.split('.')[-1]
-                        async_nexts.add(name)  # only need to store the name for the async ones because we are going to wait anyways
-                        expr = inner_expr.args[0]
-                        expr.name_or_value.value = get_modified_next_name(last_name, id(ns))
-
+                        normal_nexts.add((name, id(ns)))
+                        replacement = node.args[0]
+                        replacement.name_or_value.value = get_modified_next_name(last_name, id(ns))
+
+                    elif is_await:
+
+                        if len(node.args) != 1 or not isinstance(node.args[0], FunctionNode):
+                            raise_error_at_token(filename, code, "Can only await a function.", node.name)
+                        inner_expr = node.args[0]
+                            
+                        func = get_name_from_namespaces(node.args[0].name.value, namespaces)
+                        if func is None:
+                            raise_error_at_token(filename, code, "Attempted function call on undefined variable.", node.name)
+
+                        if isinstance(func.value, DreamberdKeyword) and func.value.value == "next":
+                            if len(inner_expr.args) != 1 or not isinstance(inner_expr.args[0], ValueNode):
+                                raise_error_at_token(filename, code, "\"Next\"keyword can only take a single value as an argument.", inner_expr.name)
+                            name = inner_expr.args[0].name_or_value.value 
+                            _, ns = get_name_and_namespace_from_namespaces(name, namespaces)
+                            if not ns:
+                                raise_error_at_line(filename, code, current_line, "Attempted to access namespace of a value without a namespace.")
+                            last_name = name.split('.')[-1]
+                            async_nexts.add(name)  # only need to store the name for the async ones because we are going to wait anyways
+                            replacement = inner_expr.args[0]
+                            replacement.name_or_value.value = get_modified_next_name(last_name, id(ns))
+
+                else:  # children are pushed backwards so they still get handled from left to right
+                    to_visit.extend((node.args[i], node.args, i) for i in reversed(range(len(node.args))))
+                    
+            case ListNode():
+                to_visit.extend((node.values[i], node.values, i) for i in reversed(range(len(node.values))))
+            case IndexNode():
+                to_visit.extend([(node.index, node, 'index'), (node.value, node, 'value')])
+            case ExpressionNode():
+                to_visit.extend([(node.right, node, 'right'), (node.left, node, 'left')])
+            case SingleOperatorNode():
+                to_visit.append((node.expression, node, 'expression'))
+
+        if replacement is not None:
+            if holder is None:
+                root = replacement
+            elif isinstance(holder, list):
+                holder[key] = replacement  # type: ignore
             else:
-                replacement_args = []
-                for arg in expr.args:
-                    new_expr, normal_arg_nexts, async_arg_nexts = handle_next_expressions(arg, namespaces)
-                    inner_nexts.append((normal_arg_nexts, async_arg_nexts))
-                    replacement_args.append(new_expr)
-                expr.args = replacement_args
-                
-        case ListNode():
-            replacement_values = []
-            for ex in expr.values:
-                new_expr, normal_expr_nexts, async_expr_nexts = handle_next_expressions(ex, namespaces)
-                inner_nexts.append((normal_expr_nexts, async_expr_nexts))
-                replacement_values.append(new_expr)
-            expr.values = replacement_values
-        case IndexNode():
-            new_value, normal_value_nexts, async_value_nexts = handle_next_expressions(expr.value, namespaces)
-            new_index, normal_index_nexts, async_index_nexts = handle_next_expressions(expr.index, namespaces)
-            expr.value = new_value 
-            expr.index = new_index
-            inner_nexts.extend([(normal_value_nexts, async_value_nexts), (normal_index_nexts, async_index_nexts)])
-        case ExpressionNode():
-            new_left, normal_left_nexts, async_left_nexts = handle_next_expressions(expr.left, namespaces)
-            new_right, normal_right_nexts, async_right_nexts = handle_next_expressions(expr.right, namespaces)
-            expr.left = new_left 
-            expr.right = new_right
-            inner_nexts.extend([(normal_left_nexts, async_left_nexts), (normal_right_nexts, async_right_nexts)])
-        case SingleOperatorNode():
-            new_expr, normal_expr_nexts, async_expr_nexts = handle_next_expressions(expr.expression, namespaces)
-            expr.expression = new_expr
-            inner_nexts.append((normal_expr_nexts, async_expr_nexts))
-    for nn, an in inner_nexts:
-        normal_nexts |= nn 
-        async_nexts |= an 
-    return expr, normal_nexts, async_nexts
+                setattr(holder, key, replacement)  # type: ignore
+
+    if normal_nexts or async_nexts:  # the tree was rewritten, so its bytecode (only ever cached on the root) is outdated
+        expr._compiled = None
+    return root, normal_nexts, async_nexts
 
 def save_previous_values_next_expr(expr_to_modify: ExpressionTreeNode, nexts: set[str], namespaces: list[Namespace]) -> Namespace:
 
@@ -966,20 +1145,10 @@ def save_previous_values_next_expr(expr_to_modify: ExpressionTreeNode, nexts: se
     return saved_namespace
 
 def determine_statement_type(possible_statements: tuple[CodeStatement, ...], namespaces: list[Namespace]) -> Optional[CodeStatement]:
-    instance_to_keywords: dict[type[CodeStatementKeywordable], set[str]] = {
-        Conditional: {'if'},
-        WhenStatement: {'when'},
-        AfterStatement: {'after'},
-        ClassDeclaration: {'class', 'className'},
-        DeleteStatement: {'delete'},
-        ReverseStatement: {'reverse'},
-        ImportStatement: {'import'}
-    }
-
     for st in possible_statements:
         if isinstance(st, CodeStatementKeywordable):
             val = get_name_from_namespaces(st.keyword.value, namespaces)
-            if val is not None and isinstance(val.value, DreamberdKeyword) and val.value.value in instance_to_keywords[type(st)]:
+            if val is not None and isinstance(val.value, DreamberdKeyword) and val.value.value in STATEMENT_KEYWORDS[type(st)]:
                 return st
         elif isinstance(st, ReturnStatement):
             if st.keyword is None:
@@ -990,24 +1159,24 @@ def determine_statement_type(possible_statements: tuple[CodeStatement, ...], nam
         elif isinstance(st, FunctionDefinition):  # allow for async and normal function definitions
             if len(st.keywords) == 1:
                 val = get_name_from_namespaces(st.keywords[0].value, namespaces)
-                if val and isinstance(val.value, DreamberdKeyword) and re.match(r"^f?u?n?c?t?i?o?n?$", val.value.value):
+                if val and isinstance(val.value, DreamberdKeyword) and val.value.value in FUNCTION_KEYWORD_VALUES:
                     return st
             elif len(st.keywords) == 2:
                 val = get_name_from_namespaces(st.keywords[0].value, namespaces)
                 other_val = get_name_from_namespaces(st.keywords[1].value, namespaces)
                 if val and other_val and isinstance(val.value, DreamberdKeyword) and isinstance(other_val.value, DreamberdKeyword) \
-                   and re.match(r"^f?u?n?c?t?i?o?n?$", other_val.value.value) and val.value.value == 'async':
+                   and other_val.value.value in FUNCTION_KEYWORD_VALUES and val.value.value == 'async':
                     return st
         elif isinstance(st, VariableDeclaration):  # allow for const const const and normal declarations
             if len(st.modifiers) == 2:
-                if all([(val := get_name_from_namespaces(mod.value, namespaces)) is not None and 
+                if all((val := get_name_from_namespaces(mod.value, namespaces)) is not None and 
                     isinstance(val.value, DreamberdKeyword) and val.value.value in {'const', 'var'}
-                    for mod in st.modifiers]):
+                    for mod in st.modifiers):
                     return st
             elif len(st.modifiers) == 3:
-                if all([(val := get_name_from_namespaces(mod.value, namespaces)) is not None and 
+                if all((val := get_name_from_namespaces(mod.value, namespaces)) is not None and 
                     isinstance(val.value, DreamberdKeyword) and val.value.value == 'const' 
-                    for mod in st.modifiers]):
+                    for mod in st.modifiers):
                     return st
         elif isinstance(st, ExportStatement):
             if isinstance(v := get_value_from_namespaces(st.to_keyword, namespaces), DreamberdKeyword) and v.value == 'to' and \
@@ -1034,10 +1203,7 @@ def adjust_for_normal_nexts(statement: CodeStatementWithExpression, async_nexts:
 
     # for each async one, wait until each one is different
     for name, start_len in zip(async_nexts, old_async_vals): 
-        curr_len = get_state_watcher(get_name_from_namespaces(name, namespaces))
-        while start_len == curr_len:  
-            exit_on_dead_listener()
-            curr_len = get_state_watcher(get_name_from_namespaces(name, namespaces))
+        wait_for_value_change(lambda: start_len == get_state_watcher(get_name_from_namespaces(name, namespaces)))
 
     # now, build a namespace for each one
     new_namespace: Namespace = {}
@@ -1083,10 +1249,7 @@ def wait_for_async_nexts(async_nexts: set[str], namespaces: list[Namespace]) ->
 
     # for each async one, wait until each one is different
     for name, start_len in zip(async_nexts, old_async_vals): 
-        curr_len = get_state_watcher(get_name_from_namespaces(name, namespaces))
-        while start_len == curr_len:  
-            exit_on_dead_listener()
-            curr_len = get_state_watcher(get_name_from_namespaces(name, namespaces))
+        wait_for_value_change(lambda: start_len == get_state_watcher(get_name_from_namespaces(name, namespaces)))
 
     # now, build a namespace for each one
     new_namespace: Namespace = {}
@@ -1320,6 +1483,7 @@ def interpret_statement(statement: CodeStatement, namespaces: list[Namespace], a
             val, ns = get_name_and_namespace_from_namespaces(statement.name.value, namespaces)
             if val and ns:
                 del ns[statement.name.value]
+                notify_value_changed()
             deleted_values.add(determine_non_name_value(statement.name))
 
         case ExpressionStatement():
@@ -1419,6 +1583,8 @@ def decrement_variable_lifetimes(namespaces: list[Namespace]) -> None:
                 remove_vars.append(name)
         for name in remove_vars:
             del ns[name]  # simply remove the variable from the name as it will be unable to provide a value
+        if remove_vars:
+            notify_value_changed()
 
 # change the current line number to some token in the code
 def edit_current_line_number(statement: CodeStatement) -> None:
@@ -1454,6 +1620,8 @@ def interpret_code_statements(statements: list[tuple[CodeStatement, ...]], names
         edit_current_line_number(statement)
         if isinstance(statement, ReturnStatement):  # if working with a return statement, either return a promise or a value
             expr, normal_nexts, async_nexts = handle_next_expressions(get_built_expression(statement.expression), namespaces)
+            if not normal_nexts and not async_nexts:  # keep the built expression so its bytecode is reused between calls
+                statement.expression = expr
             prev_namespaces = save_previous_values_next_expr(expr, async_nexts | {s[0] for s in normal_nexts}, namespaces)
             if normal_nexts:
                 promise = DreamberdPromise(None)
@@ -0,0 +1,105 @@
+from __future__ import annotations
+from typing import Any, Optional, TypeAlias, Union
+
+from dreamberd.base import Token, TokenType, OperatorType
+from dreamberd.processor.expression_tree import ExpressionTreeNode, ExpressionNode, FunctionNode, IndexNode, ListNode, SingleOperatorNode, ValueNode
+
+# the expression tree is flattened into a list of (opcode, argument) pairs that get run by a stack machine in the
+# interpreter. this is way faster than walking the tree because there is no recursion and no `match` on every node
+CompiledExpression: TypeAlias = tuple[list[int], list[Any]]
+
+LOAD_NAME     = 0   # arg: index of the token of a name or value
+LOAD_STRING   = 1   # arg: index of the token of a string, this needs to be formatted
+BINOP         = 2   # arg: index of the ExpressionNode, used for the operator and its token
+JUMP_IF_TRUE  = 3   # arg: where to jump if the top of the stack is true, leaving it there (used for short circuiting)
+JUMP_IF_FALSE = 4   # arg: same thing but for false
+LOAD_FUNC     = 5   # arg: index of the call site, which is a tuple of (FunctionNode, pc after the call, arg count, caller)
+CALL          = 6   # arg: index of the same call site as the LOAD_FUNC
+BUILD_LIST    = 7   # arg: number of values to pop off the stack
+INDEX         = 8   # arg: unused
+UNARY         = 9   # arg: index of the operator token
+LOAD_NUMBER   = 10  # arg: index of (ValueNode, number), for values that are number literals unless someone declared them as a name
+FOLD          = 11  # arg: index of [ExpressionNode, left ValueNode, right ValueNode, pc after the BINOP, result], see below
+
+# operations on two number literals that always give the same result, these get worked out once and then reused for as long
+# as neither number is declared as a name and nothing is deleted. the normal LOAD_NUMBER, LOAD_NUMBER, BINOP code follows
+# the FOLD and gets run instead if that doesn't hold. OR and AND aren't here because they are random for maybe values
+FOLDABLE_OPERATORS = {OperatorType.ADD, OperatorType.SUB, OperatorType.MUL, OperatorType.DIV, OperatorType.EXP, 
+                      OperatorType.E, OperatorType.EE, OperatorType.NE, OperatorType.EEE, OperatorType.NEE,
+                      OperatorType.LT, OperatorType.LE, OperatorType.GT, OperatorType.GE}
+
+def get_number_literal(node: ExpressionTreeNode) -> Optional[Union[int, float]]:
+    """ The number a value node stands for if it isn't a name, which is parsed the same way as in determine_non_name_value. """
+    if not isinstance(node, ValueNode) or node.name_or_value.type == TokenType.STRING:
+        return None
+    if len(v := node.name_or_value.value.split('.')) <= 2 and all(x.isdecimal() for x in v):
+        return [int, float][len(v) - 1](node.name_or_value.value)
+    return None
+
+def compile_expression(expr: ExpressionTreeNode) -> CompiledExpression:
+    """ Linearizes an expression tree into bytecode and a list of constants that the bytecode points into. """
+    code: list[int] = []
+    consts: list[Any] = []
+
+    def add_const(val: Any) -> int:
+        consts.append(val)
+        return len(consts) - 1
+
+    def compile_node(node: ExpressionTreeNode) -> None:
+        match node:
+            case ValueNode():
+                if node.name_or_value.type == TokenType.STRING:
+                    code.extend([LOAD_STRING, add_const(node.name_or_value)])
+                elif (number := get_number_literal(node)) is not None:
+                    code.extend([LOAD_NUMBER, add_const((node, number))])
+                else:
+                    code.extend([LOAD_NAME, add_const(node.name_or_value)])
+            case ExpressionNode():
+                fold = None
+                if node.operator in FOLDABLE_OPERATORS and get_number_literal(node.left) is not None and get_number_literal(node.right) is not None:
+                    fold = [node, node.left, node.right, -1, None]
+                    code.extend([FOLD, add_const(fold)])
+                compile_node(node.left)
+                jump_index = -1
+                if node.operator == OperatorType.OR or node.operator == OperatorType.AND:
+                    code.extend([JUMP_IF_TRUE if node.operator == OperatorType.OR else JUMP_IF_FALSE, -1])
+                    jump_index = len(code) - 1
+                compile_node(node.right)
+                code.extend([BINOP, add_const(node)])
+                if jump_index != -1:
+                    code[jump_index] = len(code)
+                if fold is not None:
+                    fold[3] = len(code)
+            case FunctionNode():
+
+                # the caller of a method is artificially put in as the first argument, as this is the imaginary "this"
+                call_site = add_const(None)
+                code.extend([LOAD_FUNC, call_site])
+                caller = None
+                if len(name_split := node.name.value.split('.')) > 1:
+                    caller = '.'.join(name_split[:-1])
+                    compile_node(ValueNode(Token(TokenType.NAME, caller, node.name.line, node.name.col)))
+                for arg in node.args:
+                    compile_node(arg)
+                code.extend([CALL, call_site])
+                consts[call_site] = (node, len(code), len(node.args) + int(caller is not None), caller)
+            case ListNode():
+                for val in node.values:
+                    compile_node(val)
+                code.extend([BUILD_LIST, len(node.values)])
+            case IndexNode():
+                compile_node(node.value)
+                compile_node(node.index)
+                code.extend([INDEX, 0])
+            case SingleOperatorNode():
+                compile_node(node.expression)
+                code.extend([UNARY, add_const(node.operator)])
+
+    compile_node(expr)
+    return code, consts
+
+def get_compiled_expression(expr: ExpressionTreeNode) -> CompiledExpression:
+    """ Compiles the expression once and keeps the result on the root node. """
+    if expr._compiled is None:
+        expr._compiled = compile_expression(expr)
+    return expr._compiled
@@ -5,6 +5,8 @@ from typing import Optional
 from dreamberd.base import STR_TO_OPERATOR, NonFormattedError, Token, TokenType, OperatorType, InterpretationError, raise_error_at_token
 
 class ExpressionTreeNode(metaclass=ABCMeta):
+    _compiled: Optional[tuple[list[int], list]] = None  # bytecode is cached here, see processor/bytecode.py
+
     @abstractmethod
     def to_string(self, tabs: int = 0) -> str: pass
 